@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+核心服务层微基准：对比工具间JSON往返与进程内直接调用的CPU开销
+
+上游调用替换为进程内的固定响应，只测量服务器自身的序列化/解析开销。
+
+用法：
+    python benchmarks/bench_core_api.py --iterations 2000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import shandong_mcp_server_enhanced as server  # noqa: E402
+
+# 与真实executeCode返回体量相近的响应（dags/spaceParams/log是主要体积）
+EXECUTE_CODE_RESPONSE = {
+    "dags": {
+        "dag_bench": {
+            "nodes": [{"id": f"node_{i}", "name": "Coverage.aspect", "args": {"radius": 1}} for i in range(40)]
+        }
+    },
+    "spaceParams": {"bbox": [56.0, 28.0, 56.5, 28.5], "crs": "EPSG:4326", "level": 11},
+    "log": "compile ok\n" * 200
+}
+ADD_TASK_RESPONSE = {
+    "code": 200,
+    "data": {
+        "id": 1, "dagId": "dag_bench", "taskName": "bench", "state": "running",
+        "filename": "bench", "format": "tif", "scale": "1000", "crs": "EPSG:4326",
+        "userId": server.DEFAULT_USER_ID, "userName": server.DEFAULT_USERNAME, "folder": "/bench"
+    }
+}
+
+async def fake_call_api_with_timing(url: str, **kwargs):
+    if url.endswith("/executeCode"):
+        return json.loads(json.dumps(EXECUTE_CODE_RESPONSE)), 0.0
+    if url.endswith("/addTaskRecord"):
+        return json.loads(json.dumps(ADD_TASK_RESPONSE)), 0.0
+    return "running", 0.0
+
+async def legacy_workflow(code: str) -> str:
+    """改造前的组合方式：每个子工具返回JSON字符串，调用方再json.loads"""
+    dag_result = json.loads(await server.execute_code_to_dag(code=code, use_compile_cache=False))
+    dag_id = dag_result["data"]["dag_ids"][0]
+    submit_result = json.loads(await server.submit_batch_task(dag_id=dag_id, script=code))
+    workflow_results = {
+        "steps": [
+            {"step": 1, "name": "代码转DAG", "success": dag_result["success"], "result": dag_result},
+            {"step": 2, "name": "提交批处理任务", "success": submit_result["success"], "result": submit_result}
+        ],
+        "final_status": "submitted",
+        "dag_ids": dag_result["data"]["dag_ids"],
+        "task_info": submit_result["data"],
+        "execution_times": {}
+    }
+    workflow_json = server.Result.succ(data=workflow_results, operation="DAG批处理工作流").model_dump_json()
+    # shandong_farmland_outflow 再解析一次工作流结果
+    workflow_details = json.loads(workflow_json)["data"]
+    return server.Result.succ(
+        data={"workflow_status": "submitted", "execution_steps": workflow_details["steps"]},
+        operation="山东耕地流出分析"
+    ).model_dump_json()
+
+async def core_workflow(code: str) -> str:
+    """改造后的组合方式：核心函数返回Result对象，只在最外层序列化一次"""
+    return await server.shandong_farmland_outflow(use_compile_cache=False, verbosity="full")
+
+async def measure(func, iterations: int, code: str) -> dict:
+    for _ in range(min(50, iterations)):
+        await func(code)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    payload_bytes = 0
+    for _ in range(iterations):
+        payload_bytes = len(await func(code))
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    return {
+        "cpu_us_per_workflow": round(cpu / iterations * 1e6, 1),
+        "wall_us_per_workflow": round(wall / iterations * 1e6, 1),
+        "payload_bytes": payload_bytes
+    }
+
+async def main(iterations: int) -> dict:
+    server.call_api_with_timing = fake_call_api_with_timing
+    server.job_registry.path = None
+    server.dag_watcher.watch = lambda *args, **kwargs: None
+    for name in ("shandong_mcp", "shandong_api"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    code = "import oge\noge.initialize()\n" + "x = 1\n" * 20
+    legacy = await measure(legacy_workflow, iterations, code)
+    core = await measure(core_workflow, iterations, code)
+    saved = legacy["cpu_us_per_workflow"] - core["cpu_us_per_workflow"]
+    return {
+        "iterations": iterations,
+        "legacy_json_roundtrip": legacy,
+        "core_api": core,
+        "cpu_us_saved_per_workflow": round(saved, 1),
+        "cpu_saved_ratio": round(saved / legacy["cpu_us_per_workflow"], 3) if legacy["cpu_us_per_workflow"] else None
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="核心服务层与JSON往返的CPU开销对比")
+    parser.add_argument("--iterations", type=int, default=2000, help="每种方式执行的工作流次数")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.iterations)), ensure_ascii=False, indent=2))
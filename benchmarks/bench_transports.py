@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+传输方式基准：对比SSE与Streamable HTTP的连接数和工具调用延迟
+
+在本进程内启动HTTP服务（后台线程），调用只读本地状态的get_cache_stats工具，
+只测量传输层开销。两种场景：
+- persistent: 每个客户端建立一个会话后连续调用
+- oneshot: 每次调用新建会话（短生命周期客户端/批处理脚本）
+
+服务端按ASGI scope中的客户端地址统计TCP连接数和HTTP请求数。
+SSE流式响应的POST在客户端读完事件后通常不会复用连接，可加 --json-response 对比JSON响应模式。
+
+用法：
+    python benchmarks/bench_transports.py --clients 8 --calls 50 --oneshot 100
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import shandong_mcp_server_enhanced as server  # noqa: E402
+
+TOOL_NAME = "get_cache_stats"
+
+class ConnectionCounter:
+    """记录服务端看到的TCP连接（客户端地址+端口）和HTTP请求数"""
+
+    def __init__(self, app):
+        self.app = app
+        self.connections = set()
+        self.requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            self.connections.add(tuple(scope.get("client") or ()))
+            self.requests += 1
+        await self.app(scope, receive, send)
+
+    def snapshot(self) -> tuple[int, int]:
+        return len(self.connections), self.requests
+
+def start_server(app, port: int) -> uvicorn.Server:
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error")
+    uvicorn_server = uvicorn.Server(config)
+    thread = threading.Thread(target=uvicorn_server.run, daemon=True)
+    thread.start()
+    while not uvicorn_server.started:
+        time.sleep(0.05)
+    return uvicorn_server
+
+def open_transport(transport: str, base_url: str):
+    if transport == "sse":
+        return sse_client(f"{base_url}/sse")
+    return streamablehttp_client(f"{base_url}{server.STREAMABLE_HTTP_PATH}")
+
+async def call_once(session: ClientSession) -> float:
+    start = time.perf_counter()
+    result = await session.call_tool(TOOL_NAME, {})
+    if result.isError:
+        raise RuntimeError(result.content[0].text)
+    return time.perf_counter() - start
+
+async def persistent_client(transport: str, base_url: str, calls: int) -> list[float]:
+    latencies = []
+    async with open_transport(transport, base_url) as streams:
+        async with ClientSession(streams[0], streams[1]) as session:
+            await session.initialize()
+            for _ in range(calls):
+                latencies.append(await call_once(session))
+    return latencies
+
+async def oneshot_call(transport: str, base_url: str) -> float:
+    """从建立会话到拿到结果的完整耗时"""
+    start = time.perf_counter()
+    async with open_transport(transport, base_url) as streams:
+        async with ClientSession(streams[0], streams[1]) as session:
+            await session.initialize()
+            await call_once(session)
+    return time.perf_counter() - start
+
+def summarize(latencies: list[float], wall: float, counter: ConnectionCounter, before: tuple[int, int]) -> dict:
+    connections, requests = counter.snapshot()
+    ordered = sorted(latencies)
+    p99_index = min(len(ordered) - 1, int(len(ordered) * 0.99))
+    return {
+        "calls": len(latencies),
+        "tcp_connections": connections - before[0],
+        "http_requests": requests - before[1],
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p99_ms": round(ordered[p99_index] * 1000, 2),
+        "calls_per_second": round(len(latencies) / wall, 1),
+    }
+
+async def run_scenarios(base_url: str, counter: ConnectionCounter, clients: int, calls: int, oneshot: int) -> dict:
+    results = {}
+    for transport in ("sse", "streamable_http"):
+        before = counter.snapshot()
+        start = time.perf_counter()
+        per_client = await asyncio.gather(*[persistent_client(transport, base_url, calls) for _ in range(clients)])
+        persistent = summarize([x for xs in per_client for x in xs], time.perf_counter() - start, counter, before)
+
+        before = counter.snapshot()
+        start = time.perf_counter()
+        latencies = []
+        # 限制并发，模拟一批短生命周期客户端
+        semaphore = asyncio.Semaphore(clients)
+
+        async def limited():
+            async with semaphore:
+                latencies.append(await oneshot_call(transport, base_url))
+
+        await asyncio.gather(*[limited() for _ in range(oneshot)])
+        results[transport] = {
+            "persistent": persistent,
+            "oneshot": summarize(latencies, time.perf_counter() - start, counter, before),
+        }
+    return results
+
+def main(clients: int, calls: int, oneshot: int, port: int, json_response: bool = False) -> dict:
+    for name in ("shandong_mcp", "shandong_api", "mcp", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    server.job_registry.path = None
+    server.STREAMABLE_HTTP_JSON_RESPONSE = json_response
+    if server.StreamableHTTPSessionManager is None:
+        raise SystemExit("当前mcp SDK不支持Streamable HTTP（需要 mcp>=1.8）")
+
+    counter = ConnectionCounter(server.create_starlette_app(server.mcp._mcp_server))
+    uvicorn_server = start_server(counter, port)
+    try:
+        results = asyncio.run(run_scenarios(f"http://127.0.0.1:{port}", counter, clients, calls, oneshot))
+    finally:
+        uvicorn_server.should_exit = True
+    return {
+        "clients": clients,
+        "calls_per_client": calls,
+        "oneshot_calls": oneshot,
+        "tool": TOOL_NAME,
+        "streamable_http_json_response": json_response,
+        **results
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SSE与Streamable HTTP的连接数和延迟对比")
+    parser.add_argument("--clients", type=int, default=8, help="并发客户端数")
+    parser.add_argument("--calls", type=int, default=50, help="persistent场景每个客户端的调用次数")
+    parser.add_argument("--oneshot", type=int, default=100, help="oneshot场景的总调用次数")
+    parser.add_argument("--port", type=int, default=18765, help="基准服务监听端口")
+    parser.add_argument("--json-response", action="store_true", help="Streamable HTTP直接返回JSON而非SSE流")
+    args = parser.parse_args()
+    result = main(args.clients, args.calls, args.oneshot, args.port, args.json_response)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+负载测试：在本地模拟上游上通过stdio/SSE驱动MCP工具，统计吞吐量和延迟分位数
+
+默认在本进程内启动 benchmarks/mock_upstream.py（后台线程），再以子进程方式启动服务器，
+通过 SHANDONG_MCP_*_URL 环境变量把服务器的上游指向模拟服务。服务器以临时目录作为
+SHANDONG_MCP_HOME运行，不会写入仓库的 logs/ 和 data/。
+
+场景：
+- aspect:    coverage_aspect_analysis（每次随机平移bbox，关闭缓存）
+- outflow:   shandong_farmland_outflow（executeCode + addTaskRecord，不等待完成）
+- big_query: run_big_query（force_refresh，每次都请求上游）
+- status:    query_task_status（使用outflow场景提交的DAG）
+
+工具返回isError或success=false都计为错误。结果以JSON保存，可用 --compare 与旧版本结果对比。
+
+用法：
+    python benchmarks/load_test.py --transport stdio sse --concurrency 16 --requests 400
+    python benchmarks/load_test.py --latency process=lognormal:200:0.5 --error-rate all=0.01
+    python benchmarks/load_test.py --compare benchmarks/results/load_test_old.json
+"""
+
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+import httpx
+import uvicorn
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+SERVER_SCRIPT = REPO_DIR / "shandong_mcp_server_enhanced.py"
+
+sys.path.insert(0, str(BENCH_DIR))
+
+import mock_upstream  # noqa: E402
+
+SCENARIOS = ("aspect", "outflow", "big_query", "status")
+
+def scenario_call(scenario: str, index: int, dag_ids: list) -> tuple[str, dict]:
+    """返回场景第index次调用的工具名和参数"""
+    if scenario == "aspect":
+        rng = random.Random(index)
+        lon, lat = 116 + rng.random() * 5, 35 + rng.random() * 2
+        return "coverage_aspect_analysis", {
+            "bbox": [round(lon, 4), round(lat, 4), round(lon + 0.1, 4), round(lat + 0.1, 4)],
+            "use_cache": False,
+        }
+    if scenario == "outflow":
+        return "shandong_farmland_outflow", {"use_compile_cache": False, "verbosity": "minimal"}
+    if scenario == "big_query":
+        return "run_big_query", {"force_refresh": True}
+    return "query_task_status", {"dag_id": dag_ids[index % len(dag_ids)] if dag_ids else "mock_unknown"}
+
+def parse_result(result) -> tuple[bool, dict]:
+    if result.isError or not result.content:
+        return False, {}
+    try:
+        payload = json.loads(result.content[0].text)
+    except (ValueError, AttributeError):
+        return False, {}
+    return bool(payload.get("success", True)), payload
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+def summarize(latencies: list[float], errors: int, wall: float) -> dict:
+    ordered = sorted(latencies)
+    total = len(latencies) + errors
+    summary = {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "throughput_rps": round(total / wall, 2) if wall else 0.0,
+        "wall_seconds": round(wall, 3),
+    }
+    if ordered:
+        summary.update({
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        })
+    return summary
+
+async def run_scenario(sessions: list[ClientSession], scenario: str, concurrency: int, requests: int, dag_ids: list) -> dict:
+    """concurrency个工作协程共同完成requests次调用；多个会话时按工作协程轮流分配"""
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+
+    async def worker(worker_id: int):
+        nonlocal errors
+        session = sessions[worker_id % len(sessions)]
+        for index in counter:
+            tool, arguments = scenario_call(scenario, index, dag_ids)
+            start = time.perf_counter()
+            try:
+                ok, payload = parse_result(await session.call_tool(tool, arguments))
+            except Exception:
+                ok, payload = False, {}
+            elapsed = time.perf_counter() - start
+            if not ok:
+                errors += 1
+                continue
+            latencies.append(elapsed)
+            if scenario == "outflow":
+                dag_id = ((payload.get("data") or {}).get("dag_info") or {}).get("primary_dag_id")
+                if dag_id and dag_id != "unknown":
+                    dag_ids.append(dag_id)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(i) for i in range(concurrency)])
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+async def run_suite(sessions: list[ClientSession], scenarios: list[str], concurrency: int, requests: int, warmup: int) -> dict:
+    dag_ids: list = []
+    results = {}
+    for scenario in scenarios:
+        if warmup:
+            await run_scenario(sessions, scenario, min(concurrency, warmup), warmup, dag_ids)
+        results[scenario] = await run_scenario(sessions, scenario, concurrency, requests, dag_ids)
+    return results
+
+def server_env(upstream_url: str, workdir: Path) -> dict:
+    env = dict(os.environ)
+    env.update(mock_upstream.upstream_env(upstream_url))
+    env["SHANDONG_MCP_HOME"] = str(workdir)
+    env["PYTHONUNBUFFERED"] = "1"
+    return env
+
+async def run_stdio(args, upstream_url: str, workdir: Path) -> dict:
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=[str(SERVER_SCRIPT), "--mode", "stdio"],
+        env=server_env(upstream_url, workdir),
+        cwd=str(workdir),
+    )
+    with open(workdir / "stdio_server.log", "w") as errlog:
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                return await run_suite([session], args.scenarios, args.concurrency, args.requests, args.warmup)
+
+async def wait_for_health(base_url: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"服务器进程已退出 (code={process.returncode})")
+            try:
+                if (await client.get(f"{base_url}/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("等待服务器启动超时")
+
+async def run_sse(args, upstream_url: str, workdir: Path) -> dict:
+    base_url = f"http://127.0.0.1:{args.server_port}"
+    command = [sys.executable, str(SERVER_SCRIPT), "--mode", "http", "--host", "127.0.0.1", "--port", str(args.server_port)]
+    if args.workers > 1:
+        command += ["--workers", str(args.workers)]
+    with open(workdir / "sse_server.log", "w") as errlog:
+        process = subprocess.Popen(command, cwd=workdir, env=server_env(upstream_url, workdir), stdout=errlog, stderr=subprocess.STDOUT)
+        try:
+            await wait_for_health(base_url, process)
+            return await run_sse_sessions(base_url, args)
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+async def run_sse_sessions(base_url: str, args) -> dict:
+    """每个并发槽位一个SSE会话，模拟多个独立客户端"""
+    async def open_session(stack):
+        read, write = await stack.enter_async_context(sse_client(f"{base_url}/sse"))
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        return session
+
+    async with AsyncExitStack() as stack:
+        sessions = [await open_session(stack) for _ in range(args.concurrency)]
+        return await run_suite(sessions, args.scenarios, args.concurrency, args.requests, args.warmup)
+
+def start_mock_upstream(args) -> tuple[uvicorn.Server, mock_upstream.MockUpstream]:
+    upstream = mock_upstream.MockUpstream(mock_upstream.config_from_args(args))
+    config = uvicorn.Config(upstream.create_app(), host="127.0.0.1", port=args.port, log_level="error")
+    uvicorn_server = uvicorn.Server(config)
+    threading.Thread(target=uvicorn_server.run, daemon=True).start()
+    while not uvicorn_server.started:
+        time.sleep(0.05)
+    return uvicorn_server, upstream
+
+def fetch_upstream_stats(upstream_url: str) -> dict:
+    try:
+        return httpx.get(f"{upstream_url}/mock/stats", timeout=5).json()
+    except (httpx.HTTPError, ValueError):
+        return {}
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return "unknown"
+
+def compare(current: dict, baseline: dict) -> dict:
+    """按 传输方式/场景 对比吞吐量和p99，正值表示当前版本更高"""
+    delta = {}
+    for transport, scenarios in current["results"].items():
+        for scenario, stats in scenarios.items():
+            old = baseline.get("results", {}).get(transport, {}).get(scenario)
+            if not old:
+                continue
+            entry = {}
+            for key in ("throughput_rps", "p99_ms", "error_rate"):
+                if key in stats and key in old:
+                    change = round((stats[key] - old[key]) / old[key] * 100, 1) if old[key] else None
+                    entry[key] = {"baseline": old[key], "current": stats[key], "change_pct": change}
+            delta[f"{transport}/{scenario}"] = entry
+    return {"baseline_commit": baseline.get("git_commit"), "current_commit": current.get("git_commit"), "delta": delta}
+
+def main(args) -> dict:
+    uvicorn_server = None
+    upstream_url = args.upstream_url
+    if upstream_url is None:
+        uvicorn_server, _ = start_mock_upstream(args)
+        upstream_url = f"http://127.0.0.1:{args.port}"
+
+    results, upstream_calls = {}, {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="shandong_load_") as tmp:
+            workdir = Path(tmp)
+            for transport in args.transport:
+                runner = run_stdio if transport == "stdio" else run_sse
+                before = fetch_upstream_stats(upstream_url).get("calls", {})
+                results[transport] = asyncio.run(runner(args, upstream_url, workdir))
+                after = fetch_upstream_stats(upstream_url).get("calls", {})
+                upstream_calls[transport] = {k: after.get(k, 0) - before.get(k, 0) for k in after}
+        upstream_stats = fetch_upstream_stats(upstream_url)
+    finally:
+        if uvicorn_server is not None:
+            uvicorn_server.should_exit = True
+
+    return {
+        "git_commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "transports": args.transport,
+            "scenarios": args.scenarios,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "workers": args.workers,
+            "upstream": upstream_stats.get("config") or {"url": upstream_url},
+        },
+        "results": results,
+        "upstream_calls": upstream_calls,
+        "upstream": {key: upstream_stats.get(key) for key in ("calls", "errors", "expired_tokens", "dags")},
+    }
+
+if __name__ == "__main__":
+    parser = mock_upstream.build_arg_parser()
+    parser.description = "山东耕地流出分析MCP服务器负载测试（stdio/SSE + 本地模拟上游）"
+    parser.add_argument("--transport", nargs="+", choices=["stdio", "sse"], default=["stdio", "sse"])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16, help="并发调用数（SSE模式下同时也是会话数）")
+    parser.add_argument("--requests", type=int, default=200, help="每个场景的调用次数")
+    parser.add_argument("--warmup", type=int, default=10, help="每个场景正式计时前的预热调用次数")
+    parser.add_argument("--server-port", type=int, default=18766, help="SSE模式下服务器的监听端口")
+    parser.add_argument("--workers", type=int, default=1, help="SSE模式下服务器的worker进程数")
+    parser.add_argument("--upstream-url", default=None, help="使用已运行的模拟上游（不在本进程内启动）")
+    parser.add_argument("--output", default=None, help="结果JSON路径（默认 benchmarks/results/load_test_<时间>.json）")
+    parser.add_argument("--compare", default=None, metavar="BASELINE_JSON", help="与旧版本的结果对比")
+    args = parser.parse_args()
+
+    report = main(args)
+    output = Path(args.output) if args.output else BENCH_DIR / "results" / f"load_test_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.compare:
+        report = compare(report, json.loads(Path(args.compare).read_text(encoding="utf-8")))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f"结果已保存: {output}", file=sys.stderr)
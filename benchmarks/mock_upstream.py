@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+本地模拟上游：计算网关、DAG API、OAuth
+
+模拟服务器实际调用的接口，用于在没有内网环境时测量服务器自身的开销：
+- POST /gateway/computation-api/process  (Coverage.aspect, FeatureCollection.runBigQuery)
+- POST /api/oge-dag-22/executeCode
+- POST /api/oge-dag-22/addTaskRecord
+- GET  /api/oge-dag-22/getState?dagId=...
+- POST /api/oauth/token
+- GET  /mock/stats  (各接口调用次数，供负载测试统计上游流量)
+
+每个接口的延迟分布和错误率可单独配置；签发的Token带exp，过期后返回code=40003，与真实网关一致。
+
+用法：
+    python benchmarks/mock_upstream.py --port 18080 \\
+        --latency process=lognormal:200:0.5 --latency executeCode=uniform:500:1500 \\
+        --error-rate process=0.01 --token-ttl 600 --dag-runtime uniform:2000:5000
+
+服务器通过环境变量指向模拟上游：
+    SHANDONG_MCP_INTRANET_API_URL=http://127.0.0.1:18080/gateway/computation-api/process
+    SHANDONG_MCP_OGE_API_URL=http://127.0.0.1:18080/gateway/computation-api/process
+    SHANDONG_MCP_DAG_API_URL=http://127.0.0.1:18080/api/oge-dag-22
+    SHANDONG_MCP_OAUTH_TOKEN_URL=http://127.0.0.1:18080/api/oauth/token
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+import uuid
+from typing import Dict, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+ROUTES = ("process", "executeCode", "addTaskRecord", "getState", "oauth")
+PROCESS_PATH = "/gateway/computation-api/process"
+DAG_API_PATH = "/api/oge-dag-22"
+OAUTH_PATH = "/api/oauth/token"
+
+class LatencyModel:
+    """
+    延迟分布（毫秒）
+
+    fixed:MS | uniform:MIN:MAX | lognormal:MEDIAN:SIGMA | exponential:MEAN
+    """
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, _, params = spec.partition(":")
+        values = [float(v) for v in params.split(":") if v]
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2, "exponential": 1}
+        if kind not in expected or len(values) != expected[kind]:
+            raise ValueError(f"无效的延迟分布: {spec}（支持 fixed/uniform/lognormal/exponential）")
+        self.spec = spec
+        self.kind = kind
+        self.values = values
+
+    def sample(self, rng: random.Random) -> float:
+        """返回一次采样的延迟（秒）"""
+        if self.kind == "fixed":
+            ms = self.values[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.values)
+        elif self.kind == "lognormal":
+            median, sigma = self.values
+            ms = median * rng.lognormvariate(0, sigma)
+        else:
+            ms = rng.expovariate(1 / self.values[0]) if self.values[0] > 0 else 0
+        return max(ms, 0) / 1000
+
+class MockConfig:
+    def __init__(
+        self,
+        latency: Dict[str, str] = None,
+        error_rate: Dict[str, float] = None,
+        token_ttl: float = 3600,
+        dag_runtime: str = "fixed:3000",
+        dag_failure_rate: float = 0.0,
+        big_query_features: int = 5000,
+        seed: Optional[int] = None
+    ):
+        latency = latency or {}
+        self.latency = {route: LatencyModel(latency.get(route, "fixed:0")) for route in ROUTES}
+        self.error_rate = {route: float((error_rate or {}).get(route, 0.0)) for route in ROUTES}
+        self.token_ttl = token_ttl
+        self.dag_runtime = LatencyModel(dag_runtime)
+        self.dag_failure_rate = dag_failure_rate
+        self.big_query_features = big_query_features
+        self.seed = seed
+
+    def describe(self) -> dict:
+        return {
+            "latency": {route: model.spec for route, model in self.latency.items()},
+            "error_rate": self.error_rate,
+            "token_ttl": self.token_ttl,
+            "dag_runtime": self.dag_runtime.spec,
+            "dag_failure_rate": self.dag_failure_rate,
+            "big_query_features": self.big_query_features,
+        }
+
+def make_token(ttl: float) -> str:
+    """生成带exp的JWT格式token（签名不校验）"""
+    def encode(obj: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).decode().rstrip("=")
+    payload = {"exp": int(time.time() + ttl), "user_name": "edu_admin", "jti": uuid.uuid4().hex}
+    return f"{encode({'alg': 'HS256', 'typ': 'JWT'})}.{encode(payload)}.mock"
+
+def token_is_valid(authorization: str) -> bool:
+    try:
+        payload = authorization.split(" ", 1)[-1].split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload))["exp"] > time.time()
+    except Exception:
+        return False
+
+class MockUpstream:
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.calls = {route: 0 for route in ROUTES}
+        self.errors = {route: 0 for route in ROUTES}
+        self.expired_tokens = 0
+        self.dags: Dict[str, tuple[float, float, bool]] = {}  # dag_id -> (提交时间, 运行时长, 是否失败)
+
+    async def _enter(self, route: str) -> Optional[Response]:
+        """计数、模拟延迟并按错误率注入失败"""
+        self.calls[route] += 1
+        delay = self.config.latency[route].sample(self.rng)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.rng.random() < self.config.error_rate[route]:
+            self.errors[route] += 1
+            return JSONResponse({"error": "mock upstream injected error"}, status_code=503)
+        return None
+
+    def _check_token(self, request: Request) -> Optional[Response]:
+        if token_is_valid(request.headers.get("authorization", "")):
+            return None
+        self.expired_tokens += 1
+        return JSONResponse({"code": 40003, "msg": "token expired"})
+
+    async def process(self, request: Request) -> Response:
+        error = await self._enter("process")
+        if error is not None:
+            return error
+        expired = self._check_token(request)
+        if expired is not None:
+            return expired
+        body = await request.json()
+        name, args = body.get("name"), body.get("args", {})
+        if name == "Coverage.aspect":
+            digest = hashlib.sha256(json.dumps(args, sort_keys=True).encode()).hexdigest()[:16]
+            return JSONResponse({
+                "type": "Coverage",
+                "name": "aspect",
+                "bbox": args.get("coverage", {}).get("preParams", {}).get("bbox"),
+                "radius": args.get("radius"),
+                "url": f"http://mock-upstream/tiles/aspect_{digest}.tif",
+            })
+        if name == "FeatureCollection.runBigQuery":
+            return JSONResponse({
+                "type": "FeatureCollection",
+                "queryId": uuid.uuid4().hex,
+                "query": args.get("query"),
+                "totalFeatures": self.config.big_query_features,
+            })
+        return JSONResponse({"error": f"mock upstream: unsupported process {name}"}, status_code=400)
+
+    async def execute_code(self, request: Request) -> Response:
+        error = await self._enter("executeCode")
+        if error is not None:
+            return error
+        expired = self._check_token(request)
+        if expired is not None:
+            return expired
+        body = await request.json()
+        dag_id = f"mock_{uuid.uuid4().hex[:16]}"
+        return JSONResponse({
+            "dags": {dag_id: {"layerName": "aspect", "nodes": [{"name": "Coverage.aspect"}]}},
+            "spaceParams": {"centerLon": 56.25, "centerLat": 28.4, "zoom": 11},
+            "log": f"compiled {len(body.get('code', ''))} chars",
+        })
+
+    async def add_task_record(self, request: Request) -> Response:
+        error = await self._enter("addTaskRecord")
+        if error is not None:
+            return error
+        expired = self._check_token(request)
+        if expired is not None:
+            return expired
+        body = await request.json()
+        dag_id = body.get("id")
+        self.dags[dag_id] = (
+            time.time(),
+            self.config.dag_runtime.sample(self.rng),
+            self.rng.random() < self.config.dag_failure_rate,
+        )
+        return JSONResponse({"code": 200, "data": {**body, "dagId": dag_id, "state": "running"}})
+
+    async def get_state(self, request: Request) -> Response:
+        error = await self._enter("getState")
+        if error is not None:
+            return error
+        expired = self._check_token(request)
+        if expired is not None:
+            return expired
+        dag = self.dags.get(request.query_params.get("dagId", ""))
+        if dag is None:
+            return PlainTextResponse("unknown")
+        submitted_at, runtime, fails = dag
+        if time.time() - submitted_at < runtime:
+            return PlainTextResponse("running")
+        return PlainTextResponse("failed" if fails else "success")
+
+    async def oauth(self, request: Request) -> Response:
+        error = await self._enter("oauth")
+        if error is not None:
+            return error
+        return JSONResponse({"data": {"token": make_token(self.config.token_ttl), "tokenHead": "Bearer "}})
+
+    async def stats(self, request: Request) -> Response:
+        return JSONResponse(self.snapshot())
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": dict(self.calls),
+            "errors": dict(self.errors),
+            "expired_tokens": self.expired_tokens,
+            "dags": len(self.dags),
+            "config": self.config.describe(),
+        }
+
+    def create_app(self) -> Starlette:
+        return Starlette(routes=[
+            Route(PROCESS_PATH, self.process, methods=["POST"]),
+            Route(f"{DAG_API_PATH}/executeCode", self.execute_code, methods=["POST"]),
+            Route(f"{DAG_API_PATH}/addTaskRecord", self.add_task_record, methods=["POST"]),
+            Route(f"{DAG_API_PATH}/getState", self.get_state),
+            Route(OAUTH_PATH, self.oauth, methods=["POST"]),
+            Route("/mock/stats", self.stats),
+        ])
+
+def upstream_env(base_url: str) -> Dict[str, str]:
+    """让服务器指向模拟上游的环境变量"""
+    return {
+        "SHANDONG_MCP_INTRANET_API_URL": f"{base_url}{PROCESS_PATH}",
+        "SHANDONG_MCP_OGE_API_URL": f"{base_url}{PROCESS_PATH}",
+        "SHANDONG_MCP_DAG_API_URL": f"{base_url}{DAG_API_PATH}",
+        "SHANDONG_MCP_OAUTH_TOKEN_URL": f"{base_url}{OAUTH_PATH}",
+    }
+
+def parse_route_options(values: list, convert) -> dict:
+    """解析 ROUTE=VALUE 形式的参数，ROUTE为 all 时应用到所有接口"""
+    result = {}
+    for item in values or []:
+        route, _, value = item.partition("=")
+        if route != "all" and route not in ROUTES:
+            raise ValueError(f"未知接口: {route}（可选: all, {', '.join(ROUTES)}）")
+        for target in (ROUTES if route == "all" else (route,)):
+            result[target] = convert(value)
+    return result
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="山东耕地流出分析MCP服务器的本地模拟上游")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--latency", action="append", metavar="ROUTE=DIST",
+                        help=f"接口延迟分布，ROUTE为all或{'/'.join(ROUTES)}，如 process=lognormal:200:0.5")
+    parser.add_argument("--error-rate", action="append", metavar="ROUTE=RATE", help="接口返回503的概率，如 process=0.01")
+    parser.add_argument("--token-ttl", type=float, default=3600, help="签发Token的有效期（秒）")
+    parser.add_argument("--dag-runtime", default="fixed:3000", help="DAG提交后到完成的时长分布")
+    parser.add_argument("--dag-failure-rate", type=float, default=0.0, help="DAG最终失败的概率")
+    parser.add_argument("--big-query-features", type=int, default=5000, help="大数据查询结果的要素数")
+    parser.add_argument("--seed", type=int, default=None, help="随机数种子")
+    return parser
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency=parse_route_options(args.latency, str),
+        error_rate=parse_route_options(args.error_rate, float),
+        token_ttl=args.token_ttl,
+        dag_runtime=args.dag_runtime,
+        dag_failure_rate=args.dag_failure_rate,
+        big_query_features=args.big_query_features,
+        seed=args.seed,
+    )
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    upstream = MockUpstream(config_from_args(args))
+    print(json.dumps(upstream_env(f"http://{args.host}:{args.port}"), indent=2))
+    uvicorn.run(upstream.create_app(), host=args.host, port=args.port, log_level="warning")
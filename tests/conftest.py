@@ -0,0 +1,66 @@
+"""
+测试夹具：在本地模拟上游（benchmarks/mock_upstream.py）上运行服务器模块
+
+服务器模块在导入时读取上游地址和运行目录，因此必须先启动模拟上游、设置环境变量再导入。
+共享的httpx连接池绑定到首次使用它的事件循环，所有测试共用一个会话级事件循环。
+"""
+
+import asyncio
+import importlib
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import uvicorn
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+sys.path.insert(0, str(REPO_DIR / "benchmarks"))
+
+import mock_upstream  # noqa: E402
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture(scope="session")
+def upstream():
+    """模拟上游（DAG运行0.3秒），测试可直接修改 upstream.config 注入延迟和错误"""
+    upstream = mock_upstream.MockUpstream(mock_upstream.MockConfig(dag_runtime="fixed:300", big_query_features=2500))
+    config = uvicorn.Config(upstream.create_app(), host="127.0.0.1", port=free_port(), log_level="error")
+    uvicorn_server = uvicorn.Server(config)
+    threading.Thread(target=uvicorn_server.run, daemon=True).start()
+    while not uvicorn_server.started:
+        time.sleep(0.05)
+    upstream.base_url = f"http://127.0.0.1:{config.port}"
+    yield upstream
+    uvicorn_server.should_exit = True
+
+@pytest.fixture(scope="session")
+def server(upstream):
+    """指向模拟上游、运行目录为临时目录的服务器模块"""
+    home = tempfile.mkdtemp(prefix="shandong_mcp_test_")
+    os.environ.update(mock_upstream.upstream_env(upstream.base_url))
+    os.environ["SHANDONG_MCP_HOME"] = home
+    return importlib.import_module("shandong_mcp_server_enhanced")
+
+@pytest.fixture(scope="session")
+def run():
+    """在会话级事件循环中运行协程"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+@pytest.fixture(autouse=True)
+def reset_upstream(upstream):
+    """每个测试后恢复模拟上游的错误率和延迟"""
+    yield
+    for route in mock_upstream.ROUTES:
+        upstream.config.error_rate[route] = 0.0
+        upstream.config.latency[route] = mock_upstream.LatencyModel()
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+async def admission_order(controller, requests):
+    """占满唯一的执行名额后按requests顺序排队，释放后返回实际执行顺序"""
+    order = []
+
+    async def call(key, weight, label):
+        await controller.acquire(key, weight)
+        order.append(label)
+        await asyncio.sleep(0)
+        controller.release(key, 0.01)
+
+    await controller.acquire("holder")
+    tasks = []
+    for key, weight, label in requests:
+        tasks.append(asyncio.create_task(call(key, weight, label)))
+        await asyncio.sleep(0)
+    assert controller.queued == len(requests)
+    controller.release("holder")
+    await asyncio.gather(*tasks)
+    return order
+
+def test_sessions_are_interleaved_fairly(server, run):
+    controller = server.AdmissionController(max_concurrency=1, session_concurrency=1, max_queue=16, session_max_queue=16)
+    requests = [("a", 1.0, f"a{i}") for i in range(4)] + [("b", 1.0, f"b{i}") for i in range(2)]
+    order = run(admission_order(controller, requests))
+    # 会话a先提交了4个调用，后到的会话b不会排在它们全部之后
+    assert order == ["a0", "b0", "a1", "b1", "a2", "a3"]
+    assert controller.active == 0 and controller.queued == 0 and not controller.sessions
+
+def test_weight_gives_proportional_share(server, run):
+    controller = server.AdmissionController(max_concurrency=1, session_concurrency=1, max_queue=16, session_max_queue=16)
+    requests = [("a", 2.0, f"a{i}") for i in range(4)] + [("b", 1.0, f"b{i}") for i in range(2)]
+    order = run(admission_order(controller, requests))
+    assert order == ["a0", "a1", "b0", "a2", "a3", "b1"]
+
+def test_full_queue_rejects_with_retry_after(server, run):
+    controller = server.AdmissionController(max_concurrency=1, session_concurrency=1, max_queue=1, session_max_queue=1)
+
+    async def scenario():
+        await controller.acquire("holder")
+        waiter = asyncio.create_task(controller.acquire("a"))
+        await asyncio.sleep(0)
+        with pytest.raises(server.AdmissionRejected) as rejected:
+            await controller.acquire("b")
+        controller.release("holder")
+        await waiter
+        controller.release("a")
+        return rejected.value
+
+    rejected = run(scenario())
+    assert rejected.reason == "queue_full" and rejected.retry_after >= 1.0
+    assert controller.rejected_total == 1
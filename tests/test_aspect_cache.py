@@ -0,0 +1,35 @@
+import mock_upstream
+
+BBOX = [117.0, 36.0, 117.1, 36.1]
+
+def aspect(server, run, bbox=BBOX):
+    return run(server.run_aspect_request(bbox, "ras", True, "Platform:Product:ASTER_GDEM_DEM30", 1))
+
+def test_second_request_hits_cache(server, upstream, run):
+    bbox = [117.2, 36.2, 117.3, 36.3]
+    first, _, first_hit = aspect(server, run, bbox)
+    calls = upstream.calls["process"]
+    second, _, second_hit = aspect(server, run, bbox)
+    assert not first_hit and second_hit
+    assert second == first
+    assert upstream.calls["process"] == calls
+
+def test_failed_payload_is_not_cached(server, upstream, run, monkeypatch):
+    # token过期且OAuth不可用：上游以HTTP 200返回 {"code": 40003}
+    monkeypatch.setattr(server, "INTRANET_AUTH_TOKEN", "Bearer " + mock_upstream.make_token(-60))
+    for attr in ("cooldown_until", "consecutive_failures", "last_error"):
+        monkeypatch.setattr(server.token_manager, attr, getattr(server.token_manager, attr))
+    upstream.config.error_rate["oauth"] = 1.0
+    key = server.aspect_cache_key(BBOX, "ras", True, "Platform:Product:ASTER_GDEM_DEM30", 1)
+
+    result, _, cache_hit = aspect(server, run)
+    assert not cache_hit
+    assert "error" in result and result["code"] == 40003
+    assert run(server.aspect_cache.get(key)) is None
+
+    # 上游恢复后重新计算并缓存成功结果
+    upstream.config.error_rate["oauth"] = 0.0
+    server.token_manager.cooldown_until = 0.0
+    result, _, cache_hit = aspect(server, run)
+    assert server.is_upstream_success(result) and not cache_hit
+    assert run(server.aspect_cache.get(key)) == result
@@ -0,0 +1,62 @@
+import pytest
+
+BBOX = [116.0, 35.0, 117.0, 36.0]
+PRODUCT = "Platform:Product:ASTER_GDEM_DEM30"
+
+def test_split_cores_cover_bbox_and_tiles_overlap(server):
+    overlap = 0.01
+    tiles = server.split_bbox_into_tiles(BBOX, 2, 3, overlap)
+    assert len(tiles) == 6
+    area = sum((t["core_bbox"][2] - t["core_bbox"][0]) * (t["core_bbox"][3] - t["core_bbox"][1]) for t in tiles)
+    assert area == pytest.approx(1.0)
+    for tile in tiles:
+        core, extended = tile["core_bbox"], tile["bbox"]
+        # 内部边向外扩展overlap，外边界不超出原始bbox
+        for i, (lo, hi) in enumerate(zip(BBOX[:2], BBOX[2:])):
+            assert extended[i] == pytest.approx(max(lo, core[i] - overlap))
+            assert extended[i + 2] == pytest.approx(min(hi, core[i + 2] + overlap))
+    corner = next(t for t in tiles if t["row"] == 0 and t["col"] == 0)
+    assert corner["bbox"][:2] == BBOX[:2] and corner["bbox"][2] == pytest.approx(corner["core_bbox"][2] + overlap)
+
+def test_failed_tile_is_retried_alone_and_results_are_merged(server, upstream, run, monkeypatch):
+    monkeypatch.setattr(server, "ASPECT_TILE_RETRY_BACKOFF", 0)
+    real_request = server.run_aspect_request
+    calls = []
+
+    async def flaky_request(bbox, *args):
+        calls.append(list(bbox))
+        if len(calls) == 1:
+            return {"error": "mock tile failure", "status_code": 503}, 0.0, False
+        return await real_request(bbox, *args)
+
+    monkeypatch.setattr(server, "run_aspect_request", flaky_request)
+    result = run(server.run_aspect_tiled(BBOX, "ras", True, PRODUCT, 1, 2, 2, 2, use_cache=False))
+
+    assert len(calls) == 5 and calls.count(calls[0]) == 2
+    assert result["succeeded_tiles"] == 4 and result["retried_tiles"] == 1 and not result["failed_tiles"]
+    assert all("result" not in tile for tile in result["tiles"])
+
+    merged = result["result"]
+    assert merged["complete"] and not merged["missing"]
+    assert merged["bbox"] == BBOX
+    assert merged["type"] == "Coverage" and merged["name"] == "aspect" and merged["radius"] == 1
+    assert len(merged["mosaic"]) == 4
+    assert len({part["url"] for part in merged["mosaic"]}) == 4
+    for part in merged["mosaic"]:
+        # 裁剪窗口为核心区域，不含重叠
+        assert part["bbox"] != part["source_bbox"]
+        assert all(a >= b - 1e-9 for a, b in zip(part["bbox"][:2], part["source_bbox"][:2]))
+
+def test_merge_reports_missing_tiles(server):
+    tiles = [
+        {"row": 0, "col": 0, "core_bbox": [0, 0, 1, 1], "bbox": [0, 0, 1.1, 1], "success": True,
+         "result": {"type": "Coverage", "url": "a.tif", "bbox": [0, 0, 1.1, 1]}},
+        {"row": 0, "col": 1, "core_bbox": [1, 0, 2, 1], "bbox": [0.9, 0, 2, 1], "success": False, "error": "x"},
+    ]
+    merged = server.merge_aspect_tiles([0, 0, 2, 1], tiles)
+    assert not merged["complete"]
+    assert merged["missing"] == [{"row": 0, "col": 1, "bbox": [1, 0, 2, 1]}]
+    # 只有一个瓦片成功时无法判断哪些字段是共同的，结果字段全部保留在瓦片中
+    assert merged["mosaic"] == [
+        {"row": 0, "col": 0, "bbox": [0, 0, 1, 1], "source_bbox": [0, 0, 1.1, 1], "type": "Coverage", "url": "a.tif"}
+    ]
@@ -0,0 +1,30 @@
+import json
+
+def call_tool(run, coroutine) -> dict:
+    return json.loads(run(coroutine))
+
+def test_query_returns_reference_only(server, upstream, run):
+    query = call_tool(run, server.run_big_query(force_refresh=True))
+    assert query["success"]
+    data = query["data"]
+    assert "features" not in data and data["queryId"]
+    handle = run(server.get_big_query_handle(data["handle_id"]))
+    assert handle["reference"]["queryId"] == data["queryId"]
+
+def test_inline_features_are_not_kept(server):
+    big_query_reference = server.big_query_reference
+    result = {"type": "FeatureCollection", "queryId": "q1", "features": [{"type": "Feature"}] * 3}
+    assert big_query_reference(result) == {"type": "FeatureCollection", "queryId": "q1"}
+    assert big_query_reference([{"type": "Feature"}] * 2) == {"type": "FeatureCollection", "featureCount": 2}
+
+def test_paging_is_unsupported_until_configured(server, upstream, run):
+    assert server.BIG_QUERY_PAGE_PROCESS is None
+    handle_id = call_tool(run, server.run_big_query())["data"]["handle_id"]
+    process_calls = upstream.calls["process"]
+    page = call_tool(run, server.fetch_big_query_features(handle_id, page_size=100))
+    assert not page["success"] and "unsupported" in page["msg"]
+    assert upstream.calls["process"] == process_calls
+
+def test_unknown_handle_is_rejected(server, run):
+    page = call_tool(run, server.fetch_big_query_features("bq_missing"))
+    assert not page["success"] and "bq_missing" in page["msg"]
@@ -0,0 +1,77 @@
+import asyncio
+import json
+import time
+
+import mock_upstream
+
+def call_tool(run, coroutine) -> dict:
+    return json.loads(run(coroutine))
+
+def test_queries_fan_out_and_deduplicate(server, upstream, run):
+    upstream.config.latency["getState"] = mock_upstream.LatencyModel("fixed:200")
+    dag_ids = [f"mock_bulk_{i}" for i in range(4)]
+    calls = upstream.calls["getState"]
+    started = time.perf_counter()
+    result = call_tool(run, server.query_task_status_bulk(dag_ids + dag_ids[:2], max_concurrency=4))
+    elapsed = time.perf_counter() - started
+    assert result["success"]
+    assert list(result["data"]["statuses"]) == dag_ids
+    assert result["data"]["summary"]["total"] == 4
+    assert upstream.calls["getState"] - calls == 4
+    # 4个查询并发执行，总耗时接近单次而不是4倍
+    assert elapsed < 0.6
+
+def test_concurrency_is_clamped(server, upstream, run, monkeypatch):
+    monkeypatch.setattr(server, "BULK_STATUS_MAX_CONCURRENCY", 2)
+    fetch_dag_status = server.fetch_dag_status
+    in_flight = peak = 0
+
+    async def counting_fetch(dag_id, auth_token=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.05)
+            return await fetch_dag_status(dag_id, auth_token)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(server, "fetch_dag_status", counting_fetch)
+    result = call_tool(run, server.query_task_status_bulk([f"mock_clamp_{i}" for i in range(6)], max_concurrency=100))
+    assert result["success"] and result["data"]["upstream_queries"] == 6
+    assert peak == 2
+
+def test_error_is_reported_per_id(server, upstream, run, monkeypatch):
+    fetch_dag_status = server.fetch_dag_status
+
+    async def failing_fetch(dag_id, auth_token=None):
+        if dag_id == "mock_bulk_bad":
+            raise RuntimeError("getState boom")
+        return await fetch_dag_status(dag_id, auth_token)
+
+    monkeypatch.setattr(server, "fetch_dag_status", failing_fetch)
+    upstream.dags["mock_bulk_done"] = (time.time() - 10, 0.0, False)
+    result = call_tool(run, server.query_task_status_bulk(["mock_bulk_done", "mock_bulk_bad"]))
+    assert result["success"]
+    statuses = result["data"]["statuses"]
+    assert statuses["mock_bulk_bad"] == {"error": "getState boom"}
+    assert statuses["mock_bulk_done"]["is_completed"]
+    assert result["data"]["summary"]["errors"] == 1 and result["data"]["summary"]["completed"] == 1
+
+def test_watched_dags_use_watcher_snapshot(server, upstream, run, monkeypatch):
+    watcher = server.DagWatcher()
+    entry = server.DagWatchEntry("mock_bulk_watched")
+    watcher._entries[entry.dag_id] = entry
+    watcher._finish(entry, "success")
+    timed_out = server.DagWatchEntry("mock_bulk_timeout")
+    watcher._entries[timed_out.dag_id] = timed_out
+    watcher._finish(timed_out, "timeout")
+    monkeypatch.setattr(server, "dag_watcher", watcher)
+
+    calls = upstream.calls["getState"]
+    result = call_tool(run, server.query_task_status_bulk(["mock_bulk_watched", "mock_bulk_timeout"]))
+    assert result["success"]
+    assert result["data"]["statuses"]["mock_bulk_watched"]["is_completed"]
+    # 监视器已超时停止跟踪的DAG仍向上游查询
+    assert result["data"]["upstream_queries"] == 1
+    assert upstream.calls["getState"] - calls == 1
@@ -0,0 +1,27 @@
+import mock_upstream
+
+def test_full_bulkhead_is_not_a_replica_failure(server, upstream, run, monkeypatch):
+    monkeypatch.setitem(server.http_pool.bulkheads, "fast", server.Bulkhead("fast", 1, 0.01))
+    pool = server.ReplicaPool("dag", [f"{upstream.base_url}{mock_upstream.DAG_API_PATH}"])
+    replica = pool.replicas[0]
+    token = "Bearer " + mock_upstream.make_token(3600)
+
+    async def scenario():
+        results = []
+        async with server.http_pool.bulkheads["fast"].slot():
+            for auth_token in [token, None] * server.CIRCUIT_MIN_REQUESTS:
+                results.append(await pool.call(
+                    lambda base_url: server.fetch_dag_status_from(base_url, "mock_bulkhead", auth_token)
+                ))
+        return results
+
+    results = run(scenario())
+    for status_data, _ in results:
+        assert status_data["status_code"] == 429
+        assert not server.is_endpoint_failure(status_data)
+    assert replica.state == "closed"
+    assert replica.total_failures == 0 and replica.outstanding == 0
+
+    # 名额释放后正常查询
+    status_data, _ = run(pool.call(lambda base_url: server.fetch_dag_status_from(base_url, "mock_bulkhead", token)))
+    assert "error" not in status_data and status_data["status"] == "unknown"
@@ -0,0 +1,95 @@
+import time
+
+import mock_upstream
+import pytest
+
+from conftest import free_port
+
+PAYLOAD = {"name": "Coverage.aspect", "args": {"radius": 1}, "dockerImageSource": "DOCKER_HUB"}
+
+@pytest.fixture
+def process_url(upstream):
+    return f"{upstream.base_url}{mock_upstream.PROCESS_PATH}"
+
+@pytest.fixture
+def dead_url():
+    return f"http://127.0.0.1:{free_port()}{mock_upstream.PROCESS_PATH}"
+
+def test_breaker_opens_half_opens_and_closes(server, upstream, run, monkeypatch, process_url, dead_url):
+    monkeypatch.setattr(server, "COMPUTATION_HEDGE_ENABLED", False)
+    oge_token = "Bearer " + mock_upstream.make_token(3600)
+    gateway = server.ComputationGateway(
+        {"intranet": [dead_url], "oge": [process_url]},
+        {"intranet": "intranet", "oge": oge_token}
+    )
+    intranet = gateway.pools[0].replicas[0]
+
+    # 内网节点连续故障：每次转移到OGE网关，OGE使用自己的凭据请求成功
+    for _ in range(server.CIRCUIT_MIN_REQUESTS):
+        result, _ = run(gateway.call(PAYLOAD))
+        assert server.is_upstream_success(result)
+    assert intranet.state == "open"
+    assert gateway.failovers == server.CIRCUIT_MIN_REQUESTS
+
+    # 熔断期间不再请求内网节点
+    run(gateway.call(PAYLOAD))
+    assert intranet.rejected >= 1
+    assert intranet.total_requests == server.CIRCUIT_MIN_REQUESTS
+
+    # 熔断期满进入半开状态，探测请求成功后恢复
+    monkeypatch.setattr(server, "CIRCUIT_OPEN_DURATION", 0.1)
+    time.sleep(0.15)
+    intranet.url = process_url
+    result, _ = run(gateway.call(PAYLOAD))
+    assert server.is_upstream_success(result)
+    assert intranet.state == "closed"
+    assert gateway.stats()["endpoints"][intranet.name]["state"] == "closed"
+
+def test_half_open_probe_failure_reopens(server, run, monkeypatch, dead_url):
+    monkeypatch.setattr(server, "CIRCUIT_OPEN_DURATION", 0.1)
+    gateway = server.ComputationGateway({"intranet": [dead_url]}, {"intranet": "intranet"})
+    intranet = gateway.pools[0].replicas[0]
+    for _ in range(server.CIRCUIT_MIN_REQUESTS):
+        run(gateway.call(PAYLOAD))
+    assert intranet.state == "open" and intranet.open_count == 1
+    time.sleep(0.15)
+    run(gateway.call(PAYLOAD))
+    assert intranet.state == "open" and intranet.open_count == 2
+
+def test_no_failover_to_group_without_credentials(server, upstream, run, process_url, dead_url):
+    gateway = server.ComputationGateway(
+        {"intranet": [dead_url], "oge": [process_url]},
+        {"intranet": "intranet", "oge": None}
+    )
+    assert [pool.name for pool in gateway.pools] == ["intranet"]
+    assert gateway.stats()["unconfigured_groups"] == ["oge"]
+    process_calls = upstream.calls["process"]
+    result, _ = run(gateway.call(PAYLOAD))
+    assert "error" in result
+    assert upstream.calls["process"] == process_calls and gateway.failovers == 0
+
+def test_token_refresh_failure_does_not_trip_breaker(server, upstream, run, monkeypatch, process_url):
+    # token过期且OAuth不可用：结果为 {"error", "code": 40003}，属于认证问题而非网关故障
+    monkeypatch.setattr(server, "INTRANET_AUTH_TOKEN", "Bearer " + mock_upstream.make_token(-60))
+    for attr in ("cooldown_until", "consecutive_failures", "last_error"):
+        monkeypatch.setattr(server.token_manager, attr, getattr(server.token_manager, attr))
+    upstream.config.error_rate["oauth"] = 1.0
+    gateway = server.ComputationGateway(
+        {"intranet": [process_url], "oge": [process_url]},
+        {"intranet": "intranet", "oge": "Bearer " + mock_upstream.make_token(3600)}
+    )
+    intranet = gateway.pools[0].replicas[0]
+    for _ in range(server.CIRCUIT_MIN_REQUESTS + 2):
+        result, _ = run(gateway.call(PAYLOAD))
+        assert result.get("code") == 40003
+        assert not server.is_endpoint_failure(result)
+    assert intranet.state == "closed" and intranet.total_failures == 0
+    assert gateway.failovers == 0
+
+def test_endpoint_failure_classification(server):
+    assert server.is_endpoint_failure({"error": "connect failed"})
+    assert server.is_endpoint_failure({"error": "bad gateway", "status_code": 502})
+    assert not server.is_endpoint_failure({"error": "not found", "status_code": 404})
+    assert not server.is_endpoint_failure({"error": "Token过期且刷新失败", "code": 40003, "auth_error": True})
+    assert not server.is_endpoint_failure({"error": "业务失败", "code": 500})
+    assert not server.is_endpoint_failure({"code": 40003, "msg": "token expired"})
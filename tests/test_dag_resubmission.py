@@ -0,0 +1,85 @@
+import sqlite3
+import time
+
+import pytest
+
+CODE = 'var dem = oge.Coverage("ASTER_GDEM_DEM30");\nexport(dem, "aspect");'
+
+@pytest.fixture
+def fast_watcher(server, monkeypatch):
+    monkeypatch.setattr(server, "DAG_WATCHER_TICK", 0.05)
+    monkeypatch.setattr(server, "DAG_POLL_INITIAL_INTERVAL", 0.1)
+
+def run_workflow(server, run):
+    started = time.monotonic()
+    result = run(server.run_dag_workflow(
+        CODE, wait_for_completion=True, use_compile_cache=True, check_interval=1, max_wait_time=10, verbosity="full"
+    ))
+    return result, time.monotonic() - started
+
+def test_compile_cache_is_off_by_default(server):
+    assert server.EXECUTE_CODE_CACHE_ENABLED is False
+
+def test_resubmitting_cached_dag_waits_for_new_run(server, upstream, run, fast_watcher):
+    first, _ = run_workflow(server, run)
+    second, elapsed = run_workflow(server, run)
+    assert first.success and second.success
+    assert second.data["dag_ids"] == first.data["dag_ids"]
+    assert second.data["task_info"]["run_id"] != first.data["task_info"]["run_id"]
+
+    # 编译缓存命中复用了同一dagId，第二次仍需等待上游重新运行完成，而不是直接返回上一次的终态
+    wait_step = second.data["steps"][-1]
+    assert wait_step["final_status"] == "completed"
+    assert wait_step["status_polls"] >= 1
+    assert wait_step["waited_time"] >= 0.2 and elapsed >= 0.2
+
+def test_job_registry_keeps_one_row_per_submission(server, run, tmp_path):
+    registry = server.JobRegistry(str(tmp_path / "jobs.db"), batch_size=16, flush_interval=0.01)
+    registry.start()
+    try:
+        registry.record("dag_a", "compiled", user_id="u1", sample_name="s1")
+        registry.record("dag_a", "submitted", run_id="run1", task_name="t1")
+        registry.record("dag_a", "success", run_id="run1")
+        registry.record("dag_a", "compiled", user_id="u1")
+        registry.record("dag_a", "submitted", run_id="run2", task_name="t2")
+        registry.record("dag_a", "running", run_id="run2")
+
+        runs = run(registry.get_runs("dag_a"))
+        assert [row["run_id"] for row in runs] == ["run2", "run1"]
+        assert [row["state"] for row in runs] == ["running", "success"]
+        assert runs[1]["sample_name"] == "s1" and runs[1]["finished_at"] is not None
+        assert run(registry.get_job("dag_a"))["run_id"] == "run2"
+
+        # 同一DAG再次提交时，上一次未结束的运行标记为superseded，重启后只恢复最新一次
+        registry.record("dag_a", "submitted", run_id="run3")
+        unfinished = run(registry.load_unfinished(3600))
+        assert [row["run_id"] for row in unfinished] == ["run3"]
+        assert run(registry.get_runs("dag_a"))[1]["state"] == "superseded"
+    finally:
+        run(registry.stop())
+
+def test_job_registry_migrates_dag_keyed_table(server, run, tmp_path):
+    path = tmp_path / "jobs.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (dag_id TEXT PRIMARY KEY, task_name TEXT, analysis_type TEXT, user_id TEXT, "
+            "username TEXT, state TEXT NOT NULL, task_id TEXT, batch_session_id TEXT, sample_name TEXT, "
+            "filename TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, finished_at REAL)"
+        )
+        conn.execute("CREATE INDEX idx_jobs_state ON jobs(state, updated_at)")
+        now = time.time()
+        conn.execute(
+            "INSERT INTO jobs (dag_id, task_name, state, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            ("dag_old", "t_old", "running", now, now)
+        )
+    conn.close()
+
+    registry = server.JobRegistry(str(path), batch_size=16, flush_interval=0.01)
+    registry.start()
+    try:
+        row = run(registry.get_job("dag_old"))
+        assert row["run_id"] == "dag_old" and row["task_name"] == "t_old"
+        registry.record("dag_old", "submitted", run_id="run_new")
+        assert len(run(registry.get_runs("dag_old"))) == 2
+    finally:
+        run(registry.stop())
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+@pytest.fixture
+def watcher(server, run, monkeypatch):
+    monkeypatch.setattr(server, "DAG_WATCHER_TICK", 0.05)
+    monkeypatch.setattr(server, "DAG_POLL_INITIAL_INTERVAL", 0.1)
+    watcher = server.DagWatcher()
+    yield watcher
+    run(watcher.stop())
+
+def test_resubmitted_dag_is_polled_again(server, upstream, run, watcher):
+    dag_id = "mock_watch_resubmit"
+    upstream.dags[dag_id] = (time.time(), 0.0, False)
+    entry = run(watcher.wait(dag_id, timeout=5))
+    assert entry.final_state == "success"
+    first_polls = entry.poll_count
+
+    # 同一run_id再次登记不会重新轮询
+    assert watcher.watch(dag_id, run_id=None).is_terminal
+
+    # 同一DAG再次提交：上游重新开始运行，监视器不能直接返回上一次的终态
+    upstream.dags[dag_id] = (time.time(), 0.3, False)
+    entry = watcher.watch(dag_id, run_id="second")
+    assert not entry.is_terminal and entry.poll_count == 0
+    assert watcher.watch(dag_id, run_id="second") is entry
+
+    started = time.monotonic()
+    entry = run(watcher.wait(dag_id, timeout=5))
+    assert entry.final_state == "success" and entry.run_id == "second"
+    assert time.monotonic() - started >= 0.2
+    assert entry.poll_count >= 1 and first_polls >= 1
+
+def test_poll_tasks_are_referenced_until_done(server, upstream, run, watcher):
+    dag_id = "mock_watch_refs"
+    upstream.dags[dag_id] = (time.time(), 0.2, False)
+    entry = run(watcher.wait(dag_id, timeout=5))
+    assert entry.final_state == "success"
+    assert watcher.stats()["polls_in_flight"] == 0
+    assert watcher.total_polls >= 1
+
+def test_poll_failure_reschedules_entry(server, upstream, run, watcher, monkeypatch):
+    dag_id = "mock_watch_poll_error"
+    upstream.dags[dag_id] = (time.time(), 0.3, False)
+    emit = watcher._emit
+    raised = []
+
+    def flaky_emit(entry, event):
+        if event == "running" and not raised:
+            raised.append(event)
+            raise RuntimeError("emit boom")
+        emit(entry, event)
+
+    monkeypatch.setattr(watcher, "_emit", flaky_emit)
+    entry = run(watcher.wait(dag_id, timeout=5))
+    # 处理异常不能让记录停在next_check_at=inf，等待方应在DAG完成时被唤醒
+    assert raised == ["running"]
+    assert entry.final_state == "success"
+    assert entry.last_error == "emit boom" and entry.error_count >= 1
+    assert entry.poll_count >= 2
@@ -0,0 +1,15 @@
+import logging
+
+def make_record(msg: str, *args) -> logging.LogRecord:
+    return logging.LogRecord("shandong_api", logging.INFO, __file__, 1, msg, args, None)
+
+def test_same_template_is_limited_across_arguments(server):
+    log_filter = server.LogRateLimitFilter(window=60, burst=2)
+    passed = [log_filter.filter(make_record("API调用成功 - URL: %s - 耗时: %.4fs", f"http://u/{i}", 0.1)) for i in range(5)]
+    assert passed == [True, True, False, False, False]
+
+def test_warnings_are_never_limited(server):
+    log_filter = server.LogRateLimitFilter(window=60, burst=1)
+    record = make_record("Token刷新失败: %s", "boom")
+    record.levelno = logging.WARNING
+    assert all(log_filter.filter(record) for _ in range(3))
@@ -0,0 +1,48 @@
+import asyncio
+
+from mock_upstream import LatencyModel
+
+def test_concurrent_refreshes_share_one_login(server, upstream, run):
+    manager = server.TokenManager()
+    before = upstream.calls["oauth"]
+    upstream.config.latency["oauth"] = LatencyModel("fixed:200")
+
+    async def scenario():
+        return await asyncio.gather(*[manager.refresh(reason="expired") for _ in range(8)])
+
+    results = run(scenario())
+    assert all(success for success, _ in results)
+    assert len({token for _, token in results}) == 1
+    assert upstream.calls["oauth"] - before == 1
+    assert manager.refresh_count == 1
+    assert manager.coalesced_waiters == 7
+
+def test_failed_refresh_starts_cooldown(server, upstream, run):
+    manager = server.TokenManager()
+    upstream.config.error_rate["oauth"] = 1.0
+    before = upstream.calls["oauth"]
+
+    success, _ = run(manager.refresh(reason="expired"))
+    assert not success
+    assert manager.consecutive_failures == 1
+    assert manager.cooldown_remaining() > 0
+
+    # 冷却期内自动刷新不再登录，热路径直接使用当前token
+    success, error = run(manager.refresh(reason="code_40003"))
+    assert not success and "冷却" in error
+    run(manager.ensure_fresh())
+    assert upstream.calls["oauth"] - before == 1
+    assert manager.cooldown_skips >= 1
+
+    # 手动刷新不受冷却限制，连续失败时冷却时间翻倍
+    first_cooldown = manager.cooldown_until
+    run(manager.refresh(reason="manual"))
+    assert upstream.calls["oauth"] - before == 2
+    assert manager.consecutive_failures == 2
+    assert manager.cooldown_until > first_cooldown
+
+    upstream.config.error_rate["oauth"] = 0.0
+    success, _ = run(manager.refresh(reason="manual"))
+    assert success
+    assert manager.consecutive_failures == 0
+    assert manager.cooldown_remaining() == 0